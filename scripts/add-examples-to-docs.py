@@ -5,12 +5,30 @@ Script to add example and test sections to documentation pages
 
 import os
 import re
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Base URL for links to files in the repository
+GH = "https://github.com/event4u-app/data-helpers/blob/main/"
+
+# Matches the first "## See Also" heading at the start of a line
+_SEE_ALSO_RE = re.compile(r"(?m)^## See Also")
+
+# Per-page status messages, formatted with the page path
+_MSG_SKIP = "⏭️  Skipping {} (already has examples section)"
+_MSG_WARN = "⚠️  No 'See Also' section found in {}"
+_MSG_OK = "✅  Updated {}"
+_MSG_MISSING = "⚠️  File not found: {}"
+_MSG_ERROR = "❌  Failed to update {}: {}"
+
 # Define the documentation pages and their examples
-DOCS_CONFIG = {
-    "starlight/src/content/docs/simple-dto/type-casting.md": {
-        "examples": [
+# Each entry: (file_path, examples, tests, test_filter)
+DOCS_CONFIG = (
+    (
+        "starlight/src/content/docs/simple-dto/type-casting.md",
+        (
             ("Basic Casts", "examples/simple-dto/type-casting/basic-casts.php", "Common type casts"),
             ("All Casts", "examples/simple-dto/type-casting/all-casts.php", "Complete cast overview"),
             ("Enum Cast", "examples/simple-dto/type-casting/enum-cast.php", "Enum casting"),
@@ -19,16 +37,17 @@ DOCS_CONFIG = {
             ("Hashed Cast", "examples/simple-dto/type-casting/hashed-cast.php", "Password hashing"),
             ("Encrypted Cast", "examples/simple-dto/type-casting/encrypted-cast.php", "Data encryption"),
             ("Lazy Cast", "examples/simple-dto/type-casting/lazy-cast.php", "Lazy loading casts"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/Casts/CastTest.php - Cast functionality tests",
-            "tests/Unit/SimpleDto/Casts/EnumCastTest.php - Enum cast tests",
-            "tests/Unit/SimpleDto/Casts/CollectionCastTest.php - Collection cast tests",
-        ],
-        "test_filter": "Cast"
-    },
-    "starlight/src/content/docs/simple-dto/validation.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/Casts/CastTest.php", "Cast functionality tests"),
+            ("tests/Unit/SimpleDto/Casts/EnumCastTest.php", "Enum cast tests"),
+            ("tests/Unit/SimpleDto/Casts/CollectionCastTest.php", "Collection cast tests"),
+        ),
+        "Cast",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/validation.md",
+        (
             ("Basic Validation", "examples/simple-dto/validation/basic-validation.php", "Simple validation rules"),
             ("Advanced Validation", "examples/simple-dto/validation/advanced-validation.php", "Complex validation scenarios"),
             ("Request Validation Core", "examples/simple-dto/validation/request-validation-core.php", "Core request validation"),
@@ -36,16 +55,17 @@ DOCS_CONFIG = {
             ("Symfony Validation", "examples/simple-dto/validation/request-validation-symfony.php", "Symfony integration"),
             ("Validation Modes", "examples/simple-dto/validation/validation-modes.php", "Different validation modes"),
             ("Nested Validation", "examples/simple-dto/validation/nested-validation.php", "Validating nested Dtos"),
-        ],
-        "tests": [
-            "tests/Unit/ValidationModesTest.php - Validation mode tests",
-            "tests/Unit/SimpleDto/ValidationTest.php - Core validation tests",
-            "tests/Unit/SimpleDto/NestedValidationTest.php - Nested validation tests",
-        ],
-        "test_filter": "Validation"
-    },
-    "starlight/src/content/docs/simple-dto/conditional-properties.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/ValidationModesTest.php", "Validation mode tests"),
+            ("tests/Unit/SimpleDto/ValidationTest.php", "Core validation tests"),
+            ("tests/Unit/SimpleDto/NestedValidationTest.php", "Nested validation tests"),
+        ),
+        "Validation",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/conditional-properties.md",
+        (
             ("Basic Conditional", "examples/simple-dto/conditional-properties/basic-conditional.php", "Simple conditional properties"),
             ("WhenCallback with Parameters", "examples/simple-dto/conditional-properties/whencallback-with-parameters.php", "Callbacks with parameters"),
             ("With Method", "examples/simple-dto/conditional-properties/with-method.php", "Using with() method"),
@@ -53,175 +73,230 @@ DOCS_CONFIG = {
             ("Custom Conditions", "examples/simple-dto/conditional-properties/custom-conditions.php", "Creating custom conditions"),
             ("Laravel Attributes", "examples/simple-dto/conditional-properties/laravel-conditional-attributes.php", "Laravel-specific attributes"),
             ("Symfony Attributes", "examples/simple-dto/conditional-properties/symfony-conditional-attributes.php", "Symfony-specific attributes"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/ConditionalPropertiesTest.php - Conditional property tests",
-            "tests/Unit/SimpleDto/ContextTest.php - Context tests",
-        ],
-        "test_filter": "Conditional"
-    },
-    "starlight/src/content/docs/simple-dto/lazy-properties.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/ConditionalPropertiesTest.php", "Conditional property tests"),
+            ("tests/Unit/SimpleDto/ContextTest.php", "Context tests"),
+        ),
+        "Conditional",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/lazy-properties.md",
+        (
             ("Basic Lazy", "examples/simple-dto/lazy-properties/basic-lazy.php", "Simple lazy properties"),
             ("Lazy Union Types", "examples/simple-dto/lazy-properties/lazy-union-types.php", "Lazy with union types"),
             ("Optional Lazy Combinations", "examples/simple-dto/lazy-properties/optional-lazy-combinations.php", "Combining optional and lazy"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/LazyPropertiesTest.php - Lazy property tests",
-        ],
-        "test_filter": "Lazy"
-    },
-    "starlight/src/content/docs/simple-dto/computed-properties.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/LazyPropertiesTest.php", "Lazy property tests"),
+        ),
+        "Lazy",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/computed-properties.md",
+        (
             ("Basic Computed", "examples/simple-dto/computed-properties/basic-computed.php", "Simple computed properties"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/ComputedPropertiesTest.php - Computed property tests",
-        ],
-        "test_filter": "Computed"
-    },
-    "starlight/src/content/docs/simple-dto/collections.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/ComputedPropertiesTest.php", "Computed property tests"),
+        ),
+        "Computed",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/collections.md",
+        (
             ("Data Collection", "examples/simple-dto/collections/data-collection.php", "Working with collections"),
             ("Dto Sorting", "examples/simple-dto/collections/dto-sorting.php", "Sorting Dtos in collections"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/CollectionTest.php - Collection tests",
-        ],
-        "test_filter": "Collection"
-    },
-    "starlight/src/content/docs/simple-dto/security-visibility.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/CollectionTest.php", "Collection tests"),
+        ),
+        "Collection",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/security-visibility.md",
+        (
             ("Visibility Hidden", "examples/simple-dto/security-visibility/visibility-hidden.php", "Hiding properties"),
             ("Visibility Context", "examples/simple-dto/security-visibility/visibility-context.php", "Context-based visibility"),
             ("Visibility Explained", "examples/simple-dto/security-visibility/visibility-explained.php", "Detailed explanation"),
             ("Real World Example", "examples/simple-dto/security-visibility/visibility-real-world.php", "Practical use case"),
             ("Static Provider", "examples/simple-dto/security-visibility/visibility-static-provider.php", "Static visibility provider"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/VisibilityTest.php - Visibility tests",
-        ],
-        "test_filter": "Visibility"
-    },
-    "starlight/src/content/docs/simple-dto/typescript-generation.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/VisibilityTest.php", "Visibility tests"),
+        ),
+        "Visibility",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/typescript-generation.md",
+        (
             ("Basic Generation", "examples/simple-dto/typescript-generation/basic-generation.php", "Generate TypeScript types"),
             ("Generator Options", "examples/simple-dto/typescript-generation/generator-options.php", "Customizing generation"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/TypeScriptGeneratorTest.php - TypeScript generation tests",
-        ],
-        "test_filter": "TypeScript"
-    },
-    "starlight/src/content/docs/simple-dto/serialization.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/TypeScriptGeneratorTest.php", "TypeScript generation tests"),
+        ),
+        "TypeScript",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/serialization.md",
+        (
             ("Serializers", "examples/simple-dto/serialization/serializers.php", "Serialization examples"),
             ("Transformers", "examples/simple-dto/serialization/transformers.php", "Data transformation"),
             ("Normalizers", "examples/simple-dto/serialization/normalizers.php", "Data normalization"),
             ("Serializer Options", "examples/simple-dto/serialization/serializer-options.php", "Customizing serialization"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/SerializationTest.php - Serialization tests",
-        ],
-        "test_filter": "Serialization"
-    },
-    "starlight/src/content/docs/simple-dto/property-mapping.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/SerializationTest.php", "Serialization tests"),
+        ),
+        "Serialization",
+    ),
+    (
+        "starlight/src/content/docs/simple-dto/property-mapping.md",
+        (
             ("Basic Mapping", "examples/simple-dto/property-mapping/basic-mapping.php", "Property name mapping"),
-        ],
-        "tests": [
-            "tests/Unit/SimpleDto/PropertyMappingTest.php - Property mapping tests",
-        ],
-        "test_filter": "PropertyMapping"
-    },
-    "starlight/src/content/docs/framework-integration/symfony.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/SimpleDto/PropertyMappingTest.php", "Property mapping tests"),
+        ),
+        "PropertyMapping",
+    ),
+    (
+        "starlight/src/content/docs/framework-integration/symfony.md",
+        (
             ("Symfony Doctrine", "examples/framework-integration/symfony/symfony-doctrine.php", "Symfony with Doctrine"),
-        ],
-        "tests": [
-            "tests/Unit/Frameworks/Symfony/SymfonyIntegrationTest.php - Symfony integration tests",
-            "tests-e2e/Symfony/ - End-to-end Symfony tests",
-        ],
-        "test_filter": "Symfony"
-    },
-    "starlight/src/content/docs/framework-integration/doctrine.md": {
-        "examples": [
+        ),
+        (
+            ("tests/Unit/Frameworks/Symfony/SymfonyIntegrationTest.php", "Symfony integration tests"),
+            ("tests-e2e/Symfony/", "End-to-end Symfony tests"),
+        ),
+        "Symfony",
+    ),
+    (
+        "starlight/src/content/docs/framework-integration/doctrine.md",
+        (
             ("Doctrine Integration", "examples/framework-integration/doctrine/doctrine-integration.php", "Working with Doctrine entities"),
-        ],
-        "tests": [
-            "tests/Unit/DataAccessor/DataAccessorDoctrineTest.php - Doctrine tests",
-            "tests/Unit/DataMutator/DataMutatorDoctrineTest.php - Doctrine mutator tests",
-        ],
-        "test_filter": "Doctrine"
-    },
-}
+        ),
+        (
+            ("tests/Unit/DataAccessor/DataAccessorDoctrineTest.php", "Doctrine tests"),
+            ("tests/Unit/DataMutator/DataMutatorDoctrineTest.php", "Doctrine mutator tests"),
+        ),
+        "Doctrine",
+    ),
+)
 
 
-def add_sections_to_file(file_path, config):
-    """Add example and test sections to a documentation file"""
+def find_existing_files(directories):
+    """Return the normalized paths of all files in the given directories, one scandir per directory"""
+    existing = set()
+    for directory in directories:
+        try:
+            with os.scandir(directory) as it:
+                existing.update(os.path.normpath(entry.path) for entry in it if entry.is_file())
+        except FileNotFoundError:
+            continue
+    return existing
 
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+
+def add_sections_to_file(file_path, examples, tests, test_filter):
+    """Add example and test sections to a documentation file, returning (updated, message)"""
+
+    # Read the raw bytes so the skip checks don't need a decoded string
+    page = Path(file_path)
+    data = page.read_bytes()
 
     # Check if already has examples section
-    if "## Code Examples" in content:
-        print(f"⏭️  Skipping {file_path} (already has examples section)")
-        return False
+    if b"## Code Examples" in data:
+        return False, _MSG_SKIP.format(file_path)
 
     # Check if has "## See Also" section
-    if "## See Also" not in content:
-        print(f"⚠️  No 'See Also' section found in {file_path}")
-        return False
+    if b"## See Also" not in data:
+        return False, _MSG_WARN.format(file_path)
+
+    content = data.decode('utf-8')
 
     # Build the new sections
-    examples_section = "\n## Code Examples\n\nThe following working examples demonstrate this feature:\n\n"
-
-    for title, path, desc in config["examples"]:
-        examples_section += f"- [**{title}**](https://github.com/event4u-app/data-helpers/blob/main/{path}) - {desc}\n"
-
-    examples_section += "\nAll examples are fully tested and can be run directly.\n"
-
-    tests_section = "\n## Related Tests\n\nThe functionality is thoroughly tested. Key test files:\n\n"
-    for test in config["tests"]:
-        # Parse test entry: "path/to/test.php - Description"
-        if " - " in test:
-            test_path, test_desc = test.split(" - ", 1)
-            test_path = test_path.strip()
-            test_desc = test_desc.strip()
-            # Extract filename from path
-            test_filename = test_path.split("/")[-1]
-            tests_section += f"- [{test_filename}](https://github.com/event4u-app/data-helpers/blob/main/{test_path}) - {test_desc}\n"
-        else:
-            # Fallback for entries without description
-            test_path = test.strip()
-            test_filename = test_path.split("/")[-1]
-            tests_section += f"- [{test_filename}](https://github.com/event4u-app/data-helpers/blob/main/{test_path})\n"
+    parts = ["\n## Code Examples\n\nThe following working examples demonstrate this feature:\n\n"]
+    parts.extend(f"- [**{title}**]({GH}{path}) - {desc}\n" for title, path, desc in examples)
+    parts.append("\nAll examples are fully tested and can be run directly.\n")
+    examples_section = "".join(parts)
+
+    parts = ["\n## Related Tests\n\nThe functionality is thoroughly tested. Key test files:\n\n"]
+    parts.extend(f"- [{path.rpartition('/')[2]}]({GH}{path}) - {desc}\n" for path, desc in tests)
+    # Ends with the "## See Also" heading that the section block replaces
+    parts.append(f"\nRun the tests:\n\n```bash\n# Run tests\ntask test:unit -- --filter={test_filter}\n```\n\n## See Also")
+    tests_section = "".join(parts)
 
-    tests_section += f"\nRun the tests:\n\n```bash\n# Run tests\ntask test:unit -- --filter={config['test_filter']}\n```\n"
+    # Insert before the first "## See Also" heading only
+    new_content = _SEE_ALSO_RE.sub(lambda m: examples_section + tests_section, content, count=1)
 
-    # Insert before "## See Also"
-    new_content = content.replace("## See Also", examples_section + tests_section + "\n## See Also")
+    # Nothing inserted (no "## See Also" heading at the start of a line)
+    if new_content == content:
+        return False, _MSG_WARN.format(file_path)
 
-    # Write back
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    # Write to a temp file and swap it in, so a failed write can't truncate the page.
+    # The swap replaces a symlinked page with a regular file; the mode is kept.
+    tmp_page = page.with_name(page.name + ".tmp")
+    try:
+        tmp_page.write_text(new_content, encoding='utf-8')
+        shutil.copymode(page, tmp_page)
+        os.replace(tmp_page, page)
+    except BaseException:
+        tmp_page.unlink(missing_ok=True)
+        raise
 
-    print(f"✅  Updated {file_path}")
-    return True
+    return True, _MSG_OK.format(file_path)
 
 
 def main():
-    print("📝 Adding example and test sections to documentation pages...\n")
+    # Collect all output and write it once at the end
+    messages = ["📝 Adding example and test sections to documentation pages...\n"]
+
+    # Flush the collected output even if an unexpected error escapes
+    try:
+        # List the docs directories once instead of failing open() on missing pages
+        existing = find_existing_files({os.path.dirname(file_path) for file_path, *_ in DOCS_CONFIG})
 
-    updated_count = 0
-    for file_path, config in DOCS_CONFIG.items():
-        if add_sections_to_file(file_path, config):
-            updated_count += 1
+        # Each page is independent and the work is file I/O, so use a thread pool.
+        # A failing page is recorded and doesn't stop the others; missing pages
+        # get no future, so messages stay in DOCS_CONFIG order.
+        updated_count = 0
+        failed_count = 0
+        found_count = 0
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = []
+            for file_path, examples, tests, test_filter in DOCS_CONFIG:
+                future = None
+                # DirEntry.path uses os.sep, the config uses "/"
+                if os.path.normpath(file_path) in existing:
+                    future = executor.submit(add_sections_to_file, file_path, examples, tests, test_filter)
+                futures.append((file_path, future))
+
+            for file_path, future in futures:
+                if future is None:
+                    messages.append(_MSG_MISSING.format(file_path))
+                    continue
+                found_count += 1
+                try:
+                    updated, message = future.result()
+                except (OSError, UnicodeDecodeError) as error:
+                    updated, message = False, _MSG_ERROR.format(file_path, error)
+                    failed_count += 1
+                updated_count += updated
+                messages.append(message)
+
+        if not found_count:
+            messages.append("\n❌  No documentation pages found (run this script from the repository root)")
+        elif failed_count:
+            messages.append(f"\n❌  Updated {updated_count} documentation pages, {failed_count} failed")
+        else:
+            messages.append(f"\n✅  Updated {updated_count} documentation pages successfully!")
+    finally:
+        sys.stdout.write("\n".join(messages) + "\n")
 
-    print(f"\n✅  Updated {updated_count} documentation pages successfully!")
+    return 1 if failed_count or not found_count else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 